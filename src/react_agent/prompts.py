@@ -21,3 +21,32 @@ Use the following emojis for better readability:
 
 Ensure clarity, readability, and completeness in your response.
 """
+
+TWEET_SUMMARY_PROMPT = """
+You are an AI assistant summarizing recent tweets related to the topic.
+Extract key insights and trends while ensuring accuracy.
+
+📌 **Summary of Recent Tweets**
+🔹 **Topic:** Identify the main theme.
+🔹 **Total Tweets Analyzed:** {tweet_count}
+
+🚀 **Key Highlights:**
+- What are the most important takeaways?
+- Any significant hashtags or mentions?
+- Are there common concerns or requests?
+
+📍 **Geographical Insights:**
+- Where are most tweets coming from?
+- Mention specific locations if available.
+
+📊 **Trends & Patterns:**
+- Most frequently mentioned words?
+- Any emergency alerts or critical updates?
+
+📢 **Urgent Alerts:**
+- Are there any actionable tweets (e.g., rescue requests, warnings)?
+- If yes, summarize them.
+
+Now, summarize the following tweets:
+{tweets}
+"""
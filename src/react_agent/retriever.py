@@ -1,37 +1,165 @@
+import asyncio
+import hashlib
+import io
+import logging
 import os
+import re
+import threading
 import requests
-from typing import List
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache, partial
+from typing import Callable, Dict, List, Optional, cast
+import faiss
+import numpy as np
 from bs4 import BeautifulSoup
+from pypdf import PdfReader
+from selectolax.lexbor import LexborHTMLParser
 from langchain_core.documents import Document
-from langchain.embeddings import OpenAIEmbeddings
-from langchain.vectorstores import Chroma
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.document_loaders import PlaywrightURLLoader
 
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.document_loaders import (
     PyPDFLoader,
     Docx2txtLoader,
     WebBaseLoader,
 )
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
 import pandas as pd
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# Embedded chunks are persisted here so warm starts only embed new content.
+# Each embedding model and index layout gets its own directory, since vector
+# sizes and index types differ.
+INDEX_TYPE = "hnsw_sq8_fixed_refine"
+PERSIST_DIRECTORY = os.path.join(
+    "./faiss_index", f"{EMBEDDING_MODEL.replace('/', '__')}__{INDEX_TYPE}"
+)
+EMBEDDING_CACHE_DIRECTORY = "./emb_cache"
+# Texts encoded per forward pass of the local embedding model.
+EMBEDDING_BATCH_SIZE = 64
+# Total characters of content below which documents are cleaned and split
+# sequentially; smaller batches finish in well under a second.
+PARALLEL_SPLIT_MIN_CHARS = 1_000_000
+# Number of chunks returned for each query.
+RETRIEVER_K = 5
+# HNSW graph settings: neighbours per node, and the candidate list sizes used
+# while building the graph and while searching it.
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 100
+HNSW_EF_SEARCH = 128
+# The int8 search returns RETRIEVER_K * RERANK_K_FACTOR candidates, which are
+# then re-scored against the exact float32 vectors.
+RERANK_K_FACTOR = 20
+
+# Shared session so repeated downloads reuse pooled keep-alive connections.
+_HTTP = requests.Session()
+_HTTP_ADAPTER = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=3)
+_HTTP.mount("http://", _HTTP_ADAPTER)
+_HTTP.mount("https://", _HTTP_ADAPTER)
+
+# Pages under this prefix are rendered by JavaScript and need a real browser.
+_PLAYWRIGHT_URL_PREFIX = "https://city.imd.gov.in"
+
+# Only content that looks like real markup (a tag, closing tag, comment or
+# doctype) is worth handing to an HTML parser.
+_HTML_TAG_RE = re.compile(r"<[a-zA-Z/!]")
+_NEWLINES_RE = re.compile(r"[\r\n]+")
+
+
+def _html_to_text(doc_content: str) -> str:
+    """Extract the text of an HTML document.
+
+    Uses selectolax's lexbor-backed C parser, falling back to BeautifulSoup
+    when it cannot produce a document tree.
+    """
+    root = LexborHTMLParser(doc_content).root
+    if root is not None:
+        return root.text(separator=" ")
+    return BeautifulSoup(doc_content, "lxml").get_text()
+
+
+def _clean_document_content(doc_content: str) -> str:
+    """Clean document content by removing HTML tags and unnecessary whitespace."""
+    if _HTML_TAG_RE.search(doc_content):
+        doc_content = _html_to_text(doc_content)
+    return _NEWLINES_RE.sub(" ", doc_content).strip()
+
+
+@cache
+def _get_text_splitter(
+    chunk_size: int, chunk_overlap: int, use_tiktoken: bool
+) -> RecursiveCharacterTextSplitter:
+    """Return a text splitter, built once per process for each configuration.
+
+    Chunks are measured in characters unless ``use_tiktoken`` is set, in which
+    case they are measured in tokens at the cost of encoding every candidate.
+    """
+    if use_tiktoken:
+        return RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+            chunk_size=chunk_size, chunk_overlap=chunk_overlap
+        )
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap, length_function=len
+    )
+
+
+def _clean_and_split(
+    doc_content: str, chunk_size: int, chunk_overlap: int, use_tiktoken: bool
+) -> List[str]:
+    """Clean a document's content and split it into chunks."""
+    text_splitter = _get_text_splitter(chunk_size, chunk_overlap, use_tiktoken)
+    return text_splitter.split_text(_clean_document_content(doc_content))
+
 
 class VectorStoreManager:
     """Singleton class to manage the vector store initialization and retrieval."""
 
     _instance = None
+    # Retrievals run on worker threads, so guard against building twice.
+    _lock = threading.Lock()
 
     def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(VectorStoreManager, cls).__new__(cls)
-            cls._instance._initialize_vectorstore()
+        with cls._lock:
+            if cls._instance is None:
+                # Only publish the instance once it is fully initialized.
+                instance = super(VectorStoreManager, cls).__new__(cls)
+                instance._initialize_vectorstore()
+                cls._instance = instance
         return cls._instance
 
+    @classmethod
+    def instance(cls) -> "VectorStoreManager":
+        """Return the shared manager, building the vector store on first access."""
+        return cls()
+
     def _initialize_vectorstore(self):
         """Initialize the vector store only once."""
         print("Initializing vector store...")
-        embedding = OpenAIEmbeddings()
+        # sentence-transformers picks the GPU automatically when one is available.
+        underlying_embedding = HuggingFaceEmbeddings(
+            model_name=EMBEDDING_MODEL,
+            encode_kwargs={
+                "batch_size": EMBEDDING_BATCH_SIZE,
+                "normalize_embeddings": True,
+            },
+        )
+        # Identical chunks (repeated headers, disclaimers) are embedded once and
+        # then served from disk, keyed by the model name and the text hash.
+        embedding = CacheBackedEmbeddings.from_bytes_store(
+            underlying_embedding,
+            LocalFileStore(EMBEDDING_CACHE_DIRECTORY),
+            namespace=EMBEDDING_MODEL,
+            batch_size=EMBEDDING_BATCH_SIZE,
+        )
         current_date = datetime.now().strftime("%d_%m_%Y")
         # trop_url = "https://mausam.imd.gov.in/backend/assets/cyclone_pdf/Tropical_Weather_Outlook_based_on_0300_UTC_of_23_01_2025.pdf"
         # modified_url = trop_url.replace("23_01_2025", current_date)
@@ -44,46 +172,173 @@ class VectorStoreManager:
         ]
 
         documents = self._load_documents_from_urls(urls)
-        cleaned_documents = [
+        split_documents_list = self._clean_and_split_documents(documents)
+
+        self.embedding = embedding
+        self.vectorstore = self._load_vectorstore()
+        self._add_missing_documents(split_documents_list)
+        if self.vectorstore is None:
+            raise ValueError("No documents were loaded to build the vector store.")
+        print("Vector store initialized.")
+
+    def _load_vectorstore(self) -> Optional[FAISS]:
+        """Load the index persisted by a previous run, if there is one."""
+        if not os.path.isdir(PERSIST_DIRECTORY):
+            return None
+        # The index is only ever written by this class, so unpickling its
+        # docstore is safe.
+        vectorstore = FAISS.load_local(
+            PERSIST_DIRECTORY, self.embedding, allow_dangerous_deserialization=True
+        )
+        self._configure_search(vectorstore.index)
+        return vectorstore
+
+    @staticmethod
+    def _configure_search(index: faiss.IndexRefineFlat) -> None:
+        """Apply the query-time search settings to an index."""
+        index.k_factor = RERANK_K_FACTOR
+        hnsw_index = cast(faiss.IndexHNSWSQ, faiss.downcast_index(index.base_index))
+        hnsw_index.hnsw.efSearch = HNSW_EF_SEARCH
+
+    def _create_vectorstore(self, dimension: int) -> FAISS:
+        """Create an empty index for ``dimension``-sized embeddings.
+
+        Candidates are found with an HNSW graph over int8 codes, a quarter of
+        the float32 size, so a query visits O(log n) compact vectors instead
+        of scanning all of them. The candidates are then reranked exactly
+        against float32 copies to recover the accuracy lost to quantization.
+        Embeddings are unit length, so an inner-product search ranks
+        documents by cosine similarity.
+        """
+        # faiss's stubs declare this argument as a ScalarQuantizer, but the
+        # constructor takes the quantizer type enum, an int at runtime.
+        quantizer_type = cast(faiss.ScalarQuantizer, faiss.ScalarQuantizer.QT_8bit)
+        hnsw_index = faiss.IndexHNSWSQ(
+            dimension, quantizer_type, HNSW_M, faiss.METRIC_INNER_PRODUCT
+        )
+        hnsw_index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index = faiss.IndexRefineFlat(hnsw_index)
+        self._configure_search(index)
+        # Unit-length embeddings keep every component within [-1, 1]. Training
+        # the quantizer on those fixed bounds, rather than on whichever chunks
+        # happen to be embedded first, means later additions are never
+        # clipped, however small the first batch was.
+        bounds = np.ones((2, dimension), dtype=np.float32)
+        bounds[0] = -1.0
+        index.train(bounds)
+        return FAISS(
+            embedding_function=self.embedding,
+            index=index,
+            docstore=InMemoryDocstore(),
+            index_to_docstore_id={},
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+        )
+
+    def _add_missing_documents(self, documents: List[Document]) -> None:
+        """Sync the index with ``documents``, embedding only new chunks.
+
+        Chunks are keyed by the sha256 of their content, so unchanged content
+        from a previous run is reused instead of being embedded again. Chunks
+        whose source text changed or disappeared are dropped; HNSW graphs
+        cannot remove entries, so the index is rebuilt from the current chunks
+        instead, with their embeddings served from the embedding cache.
+        """
+        # Identical chunks map to the same id; keep the first occurrence.
+        unique: Dict[str, Document] = {}
+        for doc in documents:
+            content_hash = hashlib.sha256(doc.page_content.encode("utf-8"))
+            unique.setdefault(content_hash.hexdigest(), doc)
+        if not unique:
+            # Nothing came back (e.g. every source failed to load); serving
+            # the last good index beats discarding it.
+            logger.warning("No chunks were loaded; keeping the persisted index.")
+            return
+        existing = (
+            set(self.vectorstore.index_to_docstore_id.values())
+            if self.vectorstore is not None
+            else set()
+        )
+        if not existing <= unique.keys():
+            self.vectorstore = None
+            existing = set()
+        missing = {id_: doc for id_, doc in unique.items() if id_ not in existing}
+        if not missing:
+            return
+
+        texts = [doc.page_content for doc in missing.values()]
+        vectors = self.embedding.embed_documents(texts)
+        if self.vectorstore is None:
+            self.vectorstore = self._create_vectorstore(len(vectors[0]))
+        self.vectorstore.add_embeddings(
+            text_embeddings=list(zip(texts, vectors)),
+            metadatas=[doc.metadata for doc in missing.values()],
+            ids=list(missing),
+        )
+        self.vectorstore.save_local(PERSIST_DIRECTORY)
+
+    def _load_documents_from_urls(self, urls: List[str]) -> List[Document]:
+        """Load documents from a list of URLs concurrently.
+
+        URLs are grouped by how they are loaded: each PDF is downloaded on its
+        own worker, while pages needing a browser and plain web pages are each
+        handed to a single loader that fetches its whole batch.
+        """
+        pdf_urls = [url for url in urls if url.endswith(".pdf")]
+        page_urls = [url for url in urls if not url.endswith(".pdf")]
+        playwright_urls = [
+            url for url in page_urls if url.startswith(_PLAYWRIGHT_URL_PREFIX)
+        ]
+        web_urls = [
+            url for url in page_urls if not url.startswith(_PLAYWRIGHT_URL_PREFIX)
+        ]
+
+        tasks: List[Callable[[], List[Document]]] = [
+            partial(self._load_pdf, url) for url in pdf_urls
+        ]
+        if playwright_urls:
+            tasks.append(PlaywrightURLLoader(playwright_urls).load)
+        if web_urls:
+            tasks.append(partial(self._load_web_pages, web_urls))
+        if not tasks:
+            return []
+
+        # Loading is network-bound, so run every batch at once.
+        with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+            futures = [executor.submit(task) for task in tasks]
+            return [doc for future in futures for doc in future.result()]
+
+    def _load_pdf(self, url: str) -> List[Document]:
+        """Download a PDF and load one document per page.
+
+        URLs that do not return the PDF (e.g. an HTML 404 page) are skipped
+        with a warning rather than handed to the PDF parser.
+        """
+        response = _HTTP.get(url)
+        if response.status_code != 200:
+            logger.warning("Skipping %s: HTTP %s", url, response.status_code)
+            return []
+        # Parse the PDF straight from memory rather than round-tripping it
+        # through a local file for PyPDFLoader.
+        reader = PdfReader(io.BytesIO(response.content))
+        return [
             Document(
-                page_content=self._clean_document_content(doc.page_content),
-                metadata=doc.metadata,
+                page_content=page.extract_text(),
+                metadata={"source": url, "page": page_number},
             )
-            for doc in documents
+            for page_number, page in enumerate(reader.pages)
         ]
-        split_documents_list = self._split_documents(cleaned_documents)
 
-        self.vectorstore = Chroma.from_documents(
-            documents=split_documents_list,
-            collection_name="rag-chroma",
-            embedding=embedding,
-        )
-        print("Vector store initialized.")
+    def _load_web_pages(self, urls: List[str]) -> List[Document]:
+        """Scrape all web pages concurrently with a single loader."""
+        loader = WebBaseLoader(urls, requests_per_second=len(urls))
 
-    def get_retriever(self):
-        """Return the retriever from the initialized vector store."""
-        return self.vectorstore.as_retriever()
+        async def collect() -> List[Document]:
+            return [doc async for doc in loader.alazy_load()]
 
-    def _load_documents_from_urls(self, urls: List[str]) -> List[Document]:
-        """Load documents from a list of URLs."""
-        docs = []
-        for url in urls:
-            if url.endswith(".pdf"):
-                response = requests.get(url)
-                pdf_path = url.split("/")[-1]
-                with open(pdf_path, "wb") as file:
-                    file.write(response.content)
-                loader = PyPDFLoader(pdf_path)
-                docs.extend(loader.load())
-            else:
-                loader = (
-                    PlaywrightURLLoader(url)
-                    if url.startswith("https://city.imd.gov.in")
-                    else WebBaseLoader(url)
-                )
-                docs.extend(loader.load())
-        return docs
+        # Called on a loader thread, which has no event loop of its own.
+        return asyncio.run(collect())
 
+    @staticmethod
     def load_documents_from_folder(folder_path: str) -> List[Document]:
         """Load documents from a folder. Supports PDF and DOCX formats."""
         documents = []
@@ -99,16 +354,18 @@ class VectorStoreManager:
                 # Load CSV file
                 try:
                     df = pd.read_csv(file_path)
-                    # Convert each row or the entire content into a Document
-                    for index, row in df.iterrows():
-                        documents.append(
-                            Document(
-                                page_content=row.to_string(
-                                    index=False
-                                ),  # Convert row to string
-                                metadata={"source": filename, "row_index": index},
-                            )
+                    # Convert each row into a Document, building all row
+                    # strings in one pass instead of iterating Series objects
+                    if df.empty:
+                        continue
+                    texts = df.astype(str).agg(" ".join, axis=1)
+                    documents.extend(
+                        Document(
+                            page_content=text,
+                            metadata={"source": filename, "row_index": index},
                         )
+                        for index, text in texts.items()
+                    )
                 except Exception as e:
                     print(f"Error loading CSV file {filename}: {e}")
             else:
@@ -117,28 +374,45 @@ class VectorStoreManager:
 
         return documents
 
-    def _clean_document_content(self, doc_content: str) -> str:
-        """Clean document content by removing HTML tags and unnecessary whitespace."""
-        if "<" in doc_content and ">" in doc_content:
-            soup = BeautifulSoup(doc_content, "html.parser")
-            doc_content = soup.get_text()
-        return doc_content.replace("\n", " ").replace("\r", " ").strip()
-
-    def _split_documents(
-        self, documents: List[Document], chunk_size=500, chunk_overlap=0
+    def _clean_and_split_documents(
+        self,
+        documents: List[Document],
+        chunk_size=2000,
+        chunk_overlap=0,
+        use_tiktoken=False,
     ) -> List[Document]:
-        """Split documents into smaller chunks."""
-        text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
-            chunk_size=chunk_size, chunk_overlap=chunk_overlap
-        )
-        return text_splitter.split_documents(documents)
+        """Clean documents and split them into smaller chunks.
 
+        ``chunk_size`` is in characters (2000 is roughly 500 tokens), or in
+        tokens when ``use_tiktoken`` is set. Batches of at least
+        PARALLEL_SPLIT_MIN_CHARS are spread over a thread pool, since lexbor
+        parses HTML without holding the GIL. A process pool would re-import
+        this module, faiss and langchain in every worker, which costs seconds
+        against milliseconds of splitting.
+        """
+        contents = [doc.page_content for doc in documents]
+        split = partial(
+            _clean_and_split,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            use_tiktoken=use_tiktoken,
+        )
+        if len(documents) > 1 and sum(map(len, contents)) >= PARALLEL_SPLIT_MIN_CHARS:
+            workers = min(len(documents), os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                split_texts = list(executor.map(split, contents))
+        else:
+            split_texts = list(map(split, contents))
+        return [
+            Document(page_content=text, metadata=dict(doc.metadata))
+            for doc, texts in zip(documents, split_texts)
+            for text in texts
+        ]
 
-# Ensure the vector store is initialized at import time
-vector_store_manager = VectorStoreManager()
 
 if __name__ == "__main__":
-    retriever = vector_store_manager.get_retriever()
+    vectorstore = VectorStoreManager.instance().vectorstore
+    assert vectorstore is not None
     question = "Is there any cyclone alert or any weather warning in Tamil Nadu?"
-    result = retriever.invoke(question)
+    result = vectorstore.similarity_search(question, k=RETRIEVER_K)
     print(f"Answer: {result}")
@@ -1,6 +1,7 @@
 import os
 from langgraph.graph import StateGraph
 from langchain_core.messages import AIMessage
+from react_agent import prompts
 from react_agent.utils import load_chat_model
 from react_agent.state import InputState, State
 from react_agent.tools import twitter_search_tool
@@ -28,34 +29,9 @@ async def summarize_tweets(state: State) -> dict:
             "messages": [AIMessage(content="No relevant tweets found to summarize.")]
         }
 
-    structured_prompt = f"""
-You are an AI assistant summarizing recent tweets related to the topic.
-Extract key insights and trends while ensuring accuracy.
-
-📌 **Summary of Recent Tweets**
-🔹 **Topic:** Identify the main theme.
-🔹 **Total Tweets Analyzed:** {len(tweets)}
-
-🚀 **Key Highlights:**
-- What are the most important takeaways?
-- Any significant hashtags or mentions?
-- Are there common concerns or requests?
-
-📍 **Geographical Insights:**
-- Where are most tweets coming from?
-- Mention specific locations if available.
-
-📊 **Trends & Patterns:**
-- Most frequently mentioned words?
-- Any emergency alerts or critical updates?
-
-📢 **Urgent Alerts:**
-- Are there any actionable tweets (e.g., rescue requests, warnings)?
-- If yes, summarize them.
-
-Now, summarize the following tweets:
-{tweets}
-"""
+    structured_prompt = prompts.TWEET_SUMMARY_PROMPT.format(
+        tweet_count=len(tweets), tweets=tweets
+    )
 
     response = await model.ainvoke(structured_prompt)
 
@@ -6,20 +6,30 @@ These tools are intended as free examples to get started. For production use,
 consider implementing more robust and specialized tools tailored to your needs.
 """
 
-from typing import Any, Callable, List, Optional, cast
-from langchain_community.tools.tavily_search import TavilySearchResults
+from langchain_core.documents import Document
 from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import InjectedToolArg, Tool
 from typing_extensions import Annotated
-from react_agent.configuration import Configuration
-from react_agent.retriever import vector_store_manager
+from react_agent.retriever import RETRIEVER_K, VectorStoreManager
+import asyncio
 import os
-import requests
-from typing import Any, Callable, List, Optional, cast
-from react_agent.utils import load_cache, save_cache
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Set, Union
+from react_agent.utils import (
+    Place,
+    SemanticCache,
+    Tweet,
+    TweetResponse,
+    User,
+    async_ttl_cache,
+    load_cache,
+    write_cache,
+)
 from langchain_core.prompts import PromptTemplate
 from dotenv import load_dotenv
 import httpx
+import msgspec
+import orjson
 
 structured_prompt = PromptTemplate.from_template(
     """
@@ -66,10 +76,120 @@ If the content is from internal sources (retriever or similar), mark it as **Int
 """
 )
 
+# Read the API credentials once rather than re-parsing .env on every call.
+load_dotenv()
+TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
+TWITTER_BEARER_TOKEN = os.getenv("TWITTER_BEARER_TOKEN")
+_TWITTER_HEADERS = {"Authorization": f"Bearer {TWITTER_BEARER_TOKEN}"}
+
+# Static parts of the Tavily search request, built once instead of per call.
+_TAVILY_URL = "https://api.tavily.com/search"
+_TAVILY_HEADERS = {
+    "Content-Type": "application/json",  # Ensure correct content type if required
+    "Authorization": TAVILY_API_KEY,  # If authentication is needed
+}
+_INCLUDE_DOMAINS = (
+    "mausam.imd.gov.in",
+    "cmwssb.tn.gov.in",
+    "beta-tnsmart.rimes.int",
+    "incois.gov.in",
+    "city.imd.gov.in",
+)
+_EXCLUDE_DOMAINS = (
+    "weatherapi.com",
+    "weathertab.com",
+    "weather2travel.com",
+    "world-weather.info",
+    "weather-atlas.com",
+    "weather25",
+    "en.climate-data.org",
+    "wisemeteo.com",
+    "easeweather.com",
+)
+
+# Seconds to wait for the Twitter API before giving up on a search.
+TWITTER_TIMEOUT = 10
+
+# Seconds to reuse the result of an identical query to each tool.
+SEARCH_CACHE_TTL = 5 * 60
+RETRIEVE_CACHE_TTL = 60 * 60
+TWITTER_CACHE_TTL = 5 * 60
+
+# Rank offset for reciprocal rank fusion; 60 is the commonly used default.
+RRF_K = 60
+
+# Results of recent retrievals, reused for near-identical queries.
+_retrieve_cache = SemanticCache(threshold=0.93, maxsize=256)
+
+_httpx_client: Optional[httpx.AsyncClient] = None
+
+# Background cache writes still in flight; holding a reference keeps them from
+# being garbage collected before they finish.
+_pending_writes: Set[asyncio.Future[None]] = set()
+# A single writer thread flushes cache snapshots in the order they were taken,
+# so an older snapshot can never overwrite a newer one on disk.
+_cache_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-writer")
+
+
+def _get_httpx_client() -> httpx.AsyncClient:
+    """Return the shared httpx client, creating it on first use.
+
+    Reusing one pooled client keeps connections to the search and Twitter APIs
+    alive (and multiplexed over HTTP/2) across tool calls instead of paying a
+    new TCP and TLS handshake for every request.
+    """
+    global _httpx_client
+    if _httpx_client is None or _httpx_client.is_closed:
+        _httpx_client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(10.0),
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+        )
+    return _httpx_client
+
+
+async def aclose() -> None:
+    """Finish pending cache writes and close the shared HTTP client.
+
+    Called from the server's shutdown hook in ``react_agent.webapp``;
+    applications embedding the graphs directly should await it on shutdown.
+    """
+    global _httpx_client
+    if _pending_writes:
+        await asyncio.gather(*_pending_writes)
+    if _httpx_client is not None:
+        await _httpx_client.aclose()
+        _httpx_client = None
+
+
+class _DefaultDict(dict[str, Any]):
+    """Mapping that renders missing template variables as empty strings."""
 
-def format_response(input_data: dict) -> str:
+    def __missing__(self, key: str) -> str:
+        return ""
+
+
+# The raw template string, formatted directly to skip PromptTemplate's
+# per-call variable validation.
+_STRUCTURED_TEMPLATE = structured_prompt.template
+
+# The template declares no variables today, so it is rendered once here and
+# returned as-is; the format_map path only runs if placeholders are added.
+_STRUCTURED_RENDERED: Optional[str] = (
+    None
+    if structured_prompt.input_variables
+    else _STRUCTURED_TEMPLATE.format_map(_DefaultDict())
+)
+
+
+def format_response(input_data: Union[dict[str, Any], str]) -> str:
     """Formats responses into structured headings and bullet points."""
-    return structured_prompt.format(**input_data)
+    if _STRUCTURED_RENDERED is not None:
+        return _STRUCTURED_RENDERED
+    # Tool passes its input through as a plain string.
+    if not isinstance(input_data, dict):
+        input_data = {}
+    return _STRUCTURED_TEMPLATE.format_map(_DefaultDict(input_data))
 
 
 format_tool = Tool(
@@ -85,105 +205,47 @@ async def search(
     """Search for general web results from trusted sites.
 
     This function performs a web search using Tavily's API without LangChain.
+    Results for a repeated query are reused for SEARCH_CACHE_TTL seconds.
     """
-    load_dotenv()
-    tavily_key = os.getenv("TAVILY_API_KEY")
-    url = "https://api.tavily.com/search"
+    return await _search(query)
+
 
+@async_ttl_cache(ttl=SEARCH_CACHE_TTL)
+async def _search(query: str) -> list[dict[str, Any]]:
+    """Run a Tavily search for ``query``."""
     params = {
         "query": query,
-        "include_domains": [
-            "mausam.imd.gov.in",
-            "cmwssb.tn.gov.in",
-            "beta-tnsmart.rimes.int",
-            "incois.gov.in",
-            "city.imd.gov.in",
-        ],
-        "exclude_domains": [
-            "weatherapi.com",
-            "weathertab.com",
-            "weather2travel.com",
-            "world-weather.info",
-            "weather-atlas.com",
-            "weather25",
-            "en.climate-data.org",
-            "wisemeteo.com",
-            "easeweather.com",
-        ],
+        "include_domains": _INCLUDE_DOMAINS,
+        "exclude_domains": _EXCLUDE_DOMAINS,
         "count": 5,
     }
 
-    headers = {
-        "Content-Type": "application/json",  # Ensure correct content type if required
-        "Authorization": tavily_key,  # If authentication is needed
-    }
-
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, json=params, headers=headers)
-
-        # Check if the response is successful
-        if response.status_code == 200:
-            # Parse the JSON response
-            data = response.json()
-
-            # Ensure the "results" key exists
-            if "results" in data:
-                results = []
-                for result in data["results"]:
-                    url = result.get(
-                        "url", "No URL found"
-                    )  # Extract the URL if available
-                    content = result.get(
-                        "content", "No content found"
-                    )  # Extract the content if available
-                    results.append(
-                        {"url": url, "content": content}
-                    )  # Store as dictionary
-                return results
-            else:
-                raise Exception("No 'results' key found in the response.")
+    response = await _get_httpx_client().post(
+        _TAVILY_URL, json=params, headers=_TAVILY_HEADERS
+    )
+
+    # Check if the response is successful
+    if response.status_code == 200:
+        # Parse the JSON response
+        data = response.json()
+
+        # Ensure the "results" key exists
+        if "results" in data:
+            results = []
+            for result in data["results"]:
+                url = result.get("url", "No URL found")  # Extract the URL if available
+                content = result.get(
+                    "content", "No content found"
+                )  # Extract the content if available
+                results.append({"url": url, "content": content})  # Store as dictionary
+            return results
         else:
-            # Raise an exception if the request fails
-            raise Exception(
-                f"Failed to fetch results: {response.status_code}, {response.text}"
-            )
-
-
-async def search_old(
-    query: str, *, config: Annotated[RunnableConfig, InjectedToolArg]
-) -> Optional[list[dict[str, Any]]]:
-    """Search for general web results from specific trusted sites like IMD,INCOIS,Tnsmart
-
-    This function performs a search using the Tavily search engine, which is designed
-    to provide comprehensive, accurate, and trusted results. It's particularly useful
-    for answering questions about current events.
-    """
-    configuration = Configuration.from_runnable_config(config)
-    wrapped = TavilySearchResults(max_results=configuration.max_search_results)
-    params = {
-        "query": query,
-        "search_depth": "advanced",
-        "include_domains": [
-            "mausam.imd.gov.in",
-            "city.imd.gov.in",
-            "aws.imd.gov.in",
-            "beta-tnsmart.rimes.int",
-        ],
-        "exclude_domains": [
-            "weatherapi.com",
-            "weathertab.com",
-            "weather2travel.com",
-            "world-weather.info",
-            "weather-atlas.com",
-            "weather25",
-            "en.climate-data.org",
-            "wisemeteo.com",
-            "easeweather.com",
-        ],
-    }
-    result = await wrapped.ainvoke(params)
-    # result = await wrapped.ainvoke({"query": query,"include_domains": ["mausam.imd.gov.in","aws.imd.gov.in","beta-tnsmart.rimes.int"]})
-    return cast(list[dict[str, Any]], result)
+            raise Exception("No 'results' key found in the response.")
+    else:
+        # Raise an exception if the request fails
+        raise Exception(
+            f"Failed to fetch results: {response.status_code}, {response.text}"
+        )
 
 
 async def retrieve(
@@ -194,79 +256,209 @@ async def retrieve(
     This tool is designed to fetch relevant documents based on semantic similarity,
     useful for answering domain-specific or context-aware questions.
     """
-    retriever = vector_store_manager.get_retriever()
-    results = retriever.invoke(query)
-    return "\n\n".join(doc.page_content for doc in results)
+    results = await _retrieve_documents(query)
+    return "\n\n".join(_format_document(doc) for doc in results)
+
+
+@async_ttl_cache(ttl=RETRIEVE_CACHE_TTL)
+async def _retrieve_documents(query: str) -> List[Document]:
+    """Retrieve the documents most similar to ``query``, best match first.
+
+    Building the store, embedding and searching are blocking, so they run on
+    worker threads to keep the event loop free.
+    """
+    manager = await asyncio.to_thread(VectorStoreManager.instance)
+    vectorstore = manager.vectorstore
+    if vectorstore is None:
+        raise ValueError("The vector store has not been built.")
+    # Embed the query once and use it for both the cache and the index lookup.
+    query_vector = await asyncio.to_thread(manager.embedding.embed_query, query)
+    cached: Optional[List[Document]] = _retrieve_cache.get(query_vector)
+    if cached is not None:
+        return cached
+
+    results: List[Document] = await asyncio.to_thread(
+        vectorstore.similarity_search_by_vector, query_vector, k=RETRIEVER_K
+    )
+    _retrieve_cache.put(query, query_vector, results)
+    return results
+
+
+async def hybrid_retrieve(
+    query: str, *, config: Annotated[RunnableConfig, InjectedToolArg]
+) -> list[dict[str, Any]]:
+    """Search trusted web sites and the internal vector store together.
+
+    Both sources are queried concurrently and their results merged with
+    reciprocal rank fusion, so items ranked highly by either source come
+    first. Use this when both live web results and internal documents may be
+    relevant. If one source fails, results from the other are still returned.
+    """
+    web, internal = await asyncio.gather(
+        _search(query), _retrieve_documents(query), return_exceptions=True
+    )
+    if isinstance(web, BaseException) and isinstance(internal, BaseException):
+        raise web
+
+    rankings = []
+    if not isinstance(web, BaseException):
+        rankings.append(
+            [{"source": result["url"], "content": result["content"]} for result in web]
+        )
+    if not isinstance(internal, BaseException):
+        rankings.append(
+            [
+                {
+                    "source": doc.metadata.get("source", "Internal Source"),
+                    "content": doc.page_content,
+                }
+                for doc in internal
+            ]
+        )
+    return _reciprocal_rank_fusion(rankings)
+
+
+def _reciprocal_rank_fusion(
+    rankings: List[List[dict[str, Any]]], k: int = RRF_K
+) -> list[dict[str, Any]]:
+    """Merge ranked result lists, scoring each item by sum(1 / (k + rank)).
+
+    Items with the same content are treated as one and their scores summed.
+    """
+    fused: dict[str, dict[str, Any]] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            entry = fused.setdefault(item["content"], {**item, "score": 0.0})
+            entry["score"] += 1.0 / (k + rank)
+    return sorted(fused.values(), key=lambda item: item["score"], reverse=True)
+
+
+def _format_document(doc: Document) -> str:
+    """Format a retrieved document, prefixed with its source when known.
+
+    Including the source lets the response formatter cite it without another
+    vector store lookup.
+    """
+    source = doc.metadata.get("source")
+    if source is None:
+        return doc.page_content
+    return f"Source: {source}\n{doc.page_content}"
 
 
 async def twitter_search_tool(query: str) -> str:
     """Fetches recent tweets based on the query.
 
     Uses the Twitter API to search for recent tweets and caches them to avoid duplication.
+    Only the tweets found for this query are returned, not the whole cache.
     """
     # configuration = Configuration.from_runnable_config(config)
-    load_dotenv()
-    bearer_token = os.getenv("TWITTER_BEARER_TOKEN")
-    if not bearer_token:
+    if not TWITTER_BEARER_TOKEN:
         return "Twitter API credentials are missing."
 
+    try:
+        payload = await _search_recent_tweets(query)
+    except _TwitterAPIError as e:
+        return str(e)
+
+    tweets = payload.data
+    places = {place.id: place for place in payload.includes.places}
+    users = {user.id: user for user in payload.includes.users}
+    if not tweets:
+        return "No tweets found."
+
+    # Merge the new tweets into the cache, keyed by tweet id
+    try:
+        cache = load_cache()
+    except (orjson.JSONDecodeError, msgspec.ValidationError) as e:
+        return f"Error: Could not read the tweet cache: {e}"
+    cached_tweets = cache.setdefault("twitter", {})
+    cached_count = len(cached_tweets)
+    for tweet in tweets:
+        cached_tweets.setdefault(tweet.id, tweet)
+    # Skip the disk write when every fetched tweet was already cached
+    if len(cached_tweets) != cached_count:
+        # Flush in the background so the tool can respond without waiting on disk
+        # Snapshot on the event loop: later calls keep adding to the live dict
+        # while the writer thread serializes this copy.
+        snapshot = {**cache, "twitter": dict(cached_tweets)}
+        write = asyncio.get_running_loop().run_in_executor(
+            _cache_writer, write_cache, snapshot
+        )
+        _pending_writes.add(write)
+        write.add_done_callback(_pending_writes.discard)
+
+    return "\n\n".join([_format_tweet(tweet, places, users) for tweet in tweets])
+
+
+class _TwitterAPIError(Exception):
+    """Raised when the Twitter API request fails. The message is user facing."""
+
+
+@async_ttl_cache(ttl=TWITTER_CACHE_TTL)
+async def _search_recent_tweets(query: str) -> TweetResponse:
+    """Call the Twitter recent search API and return the decoded payload.
+
+    Only successful responses are returned (and so cached); failures raise
+    ``_TwitterAPIError``.
+    """
     url = "https://api.twitter.com/2/tweets/search/recent"
-    headers = {"Authorization": f"Bearer {bearer_token}"}
     querystring = {
         "query": query,
         "max_results": 10,
-        "tweet.fields": ["id,created_at,author_id,text,geo"],
+        "tweet.fields": "id,created_at,author_id,text,geo",
         "expansions": "geo.place_id",
-        "place.fields": ["full_name,country"],
+        "place.fields": "full_name,country",
         "user.fields": "location",
     }
 
-    response = requests.get(url, headers=headers, params=querystring)
-    if response.status_code != 200:
-        return f"Error: {response.status_code}, {response.json()}"
-
-    tweets = response.json().get("data", [])
-    places = {p["id"]: p for p in response.json().get("includes", {}).get("places", [])}
-    users = {
-        user["id"]: user
-        for user in response.json().get("includes", {}).get("users", [])
-    }
-    if not tweets:
-        return "No tweets found."
-
-    # Load and check cache
-    cache = load_cache()
-    existing_tweets = cache.get("twitter", {})
-    existing_tweet_ids = {tweet["id"] for tweet in cache.get("twitter", {}).values()}
-    new_tweets = [tweet for tweet in tweets if tweet["id"] not in existing_tweet_ids]
-
-    # Update cache if there are new tweets
-    if new_tweets:
-        cache.setdefault("twitter", {}).update(
-            {tweet["id"]: tweet for tweet in new_tweets}
+    try:
+        response = await _get_httpx_client().get(
+            url, headers=_TWITTER_HEADERS, params=querystring, timeout=TWITTER_TIMEOUT
         )
-        save_cache(cache)
-
-    all_tweets = list(existing_tweets.values()) + new_tweets
+    except httpx.TimeoutException:
+        raise _TwitterAPIError("Error: Twitter API request timed out.") from None
+    if response.status_code != 200:
+        raise _TwitterAPIError(f"Error: {response.status_code}, {response.text}")
 
-    formatted_tweets = []
-    for tweet in all_tweets:
-        place_info = "Location: Unknown"
-        user_location = users.get(tweet["author_id"], {}).get("location", "Unknown")
+    try:
+        return msgspec.json.decode(response.content, type=TweetResponse)
+    except msgspec.DecodeError as e:
+        # Also covers msgspec.ValidationError, for bodies of the wrong shape.
+        raise _TwitterAPIError(
+            f"Error: Could not parse the Twitter API response: {e}"
+        ) from None
 
-        # If tweet geo information is available, use that
-        if tweet.get("geo"):
-            place_id = tweet["geo"]["place_id"]
-            place_info = f"Location: {places[place_id]['full_name']}, {places[place_id]['country']}"
-        # Otherwise, use user profile location if available
-        elif user_location != "Unknown":
-            place_info = f"User's Location: {user_location}"
 
-        formatted_tweets.append(
-            f"Author ID: {tweet['author_id']}\nTweet: {tweet['text']}\n{place_info}\nDate: {tweet['created_at']}"
+def _format_tweet(
+    tweet: Tweet,
+    places: dict[str, Place],
+    users: dict[str, User],
+) -> str:
+    """Format a single tweet with its best known location."""
+    # A tweet's place_id is not guaranteed to appear in the response's
+    # includes, so the geo lookup must not assume a hit.
+    place_id = tweet.geo.place_id if tweet.geo else None
+    place = places.get(place_id) if place_id else None
+
+    # If tweet geo information is available, use that
+    if place:
+        place_info = f"Location: {place.full_name}, {place.country}"
+    # Otherwise, use user profile location if available
+    else:
+        user = users.get(tweet.author_id)
+        place_info = (
+            f"User's Location: {user.location}"
+            if user and user.location
+            else "Location: Unknown"
         )
 
-    return "\n\n".join(formatted_tweets)
+    return f"Author ID: {tweet.author_id}\nTweet: {tweet.text}\n{place_info}\nDate: {tweet.created_at}"
 
 
-TOOLS: List[Callable[..., Any]] = [search, retrieve]
+TOOLS: List[Callable[..., Any]] = [
+    search,
+    retrieve,
+    hybrid_retrieve,
+    format_tool,
+    twitter_search_tool,
+]
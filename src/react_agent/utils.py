@@ -1,10 +1,28 @@
 """Utility & helper functions."""
 
+import functools
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+import msgspec
+import numpy as np
+import orjson
 from langchain.chat_models import init_chat_model
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import BaseMessage
-import os
-import json
 
 
 def get_message_text(msg: BaseMessage) -> str:
@@ -15,30 +33,224 @@ def get_message_text(msg: BaseMessage) -> str:
     elif isinstance(content, dict):
         return content.get("text", "")
     else:
-        txts = [c if isinstance(c, str) else (c.get("text") or "") for c in content]
-        return "".join(txts).strip()
+        return "".join(
+            c if isinstance(c, str) else c.get("text") or "" for c in content
+        ).strip()
 
 
+@functools.lru_cache(maxsize=8)
 def load_chat_model(fully_specified_name: str) -> BaseChatModel:
     """Load a chat model from a fully specified name.
 
+    Models are cached by name so repeated calls reuse the same client. Callers
+    must not mutate the returned model; derive a new runnable with ``.bind`` or
+    ``.bind_tools`` instead.
+
     Args:
         fully_specified_name (str): String in the format 'provider/model'.
     """
     provider, model = fully_specified_name.split("/", maxsplit=1)
     return init_chat_model(model, model_provider=provider)
 
-CACHE_FILE = 'search_cache.json'
 
-# Load existing cache
-def load_cache():
-    if os.path.exists(CACHE_FILE):
-        with open(CACHE_FILE, 'r') as file:
-            return json.load(file)
-    else:
-        return {"twitter": {}, "summarization": {}}
+class Geo(msgspec.Struct):
+    """Geo tag attached to a tweet."""
+
+    place_id: Optional[str] = None
+
+
+class Tweet(msgspec.Struct):
+    """A tweet as returned by the recent search API."""
+
+    id: str
+    author_id: str
+    text: str
+    created_at: str
+    geo: Optional[Geo] = None
+
+
+class Place(msgspec.Struct):
+    """A place expanded from ``geo.place_id``."""
+
+    id: str
+    full_name: str = ""
+    country: str = ""
+
+
+class User(msgspec.Struct):
+    """A tweet author expanded from ``author_id``."""
+
+    id: str
+    location: Optional[str] = None
+
+
+class Includes(msgspec.Struct):
+    """Objects expanded alongside the tweets."""
+
+    places: List[Place] = msgspec.field(default_factory=list)
+    users: List[User] = msgspec.field(default_factory=list)
+
+
+class TweetResponse(msgspec.Struct):
+    """Decoded body of a recent search response; unknown fields are ignored."""
+
+    data: List[Tweet] = msgspec.field(default_factory=list)
+    includes: Includes = msgspec.field(default_factory=Includes)
+
+
+CACHE_FILE = "search_cache.json"
+
+# In-memory mirror of the cache file, so it is only read from disk once
+_cache_mem: Optional[dict[str, Any]] = None
+# Saves may run on worker threads; serializing them means the file always ends
+# up holding the most recent snapshot.
+_save_lock = threading.Lock()
+
+
+def load_cache() -> dict[str, Any]:
+    """Return the tweet and summary cache, reading it from disk on first use."""
+    global _cache_mem
+    if _cache_mem is None:
+        try:
+            with open(CACHE_FILE, "rb") as file:
+                data = orjson.loads(file.read())
+        except FileNotFoundError:
+            data = {"twitter": {}, "summarization": {}}
+        # Tweets come back from disk as plain dicts; convert them once here so
+        # the cache only ever holds Tweet structs
+        data["twitter"] = msgspec.convert(
+            data.get("twitter", {}), type=dict[str, Tweet]
+        )
+        _cache_mem = data
+    return _cache_mem
+
+
+def save_cache(data: dict[str, Any]) -> None:
+    """Replace the in-memory cache with ``data`` and write it to disk."""
+    global _cache_mem
+    _cache_mem = data
+    write_cache(data)
+
+
+def write_cache(data: dict[str, Any]) -> None:
+    """Write a cache snapshot to disk, leaving the in-memory mirror untouched.
+
+    Safe to call from a worker thread as long as ``data`` is not mutated
+    while it is written.
+    """
+    with _save_lock:
+        # Write to a temporary file and rename it over the cache, so readers
+        # never see a partially written file
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(CACHE_FILE)), suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as file:
+                # Structs (e.g. cached tweets) are written as plain objects
+                file.write(orjson.dumps(data, default=msgspec.to_builtins))
+            os.replace(tmp_path, CACHE_FILE)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+T = TypeVar("T")
+
+
+def async_ttl_cache(
+    ttl: float, maxsize: int = 256
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Memoize a coroutine function on its positional arguments.
+
+    Results are reused for ``ttl`` seconds, and at most ``maxsize`` of the most
+    recently used results are kept. Exceptions are not cached. The wrapped
+    function gains a ``cache_clear()`` method.
+
+    Args:
+        ttl (float): Seconds a result stays valid.
+        maxsize (int): Maximum number of results to keep.
+    """
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        cache: OrderedDict[Tuple[Any, ...], Tuple[float, T]] = OrderedDict()
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any) -> T:
+            now = time.monotonic()
+            hit = cache.get(args)
+            if hit is not None and hit[0] > now:
+                cache.move_to_end(args)
+                return hit[1]
+            result = await func(*args)
+            cache[args] = (now + ttl, result)
+            cache.move_to_end(args)
+            while len(cache) > maxsize:
+                cache.popitem(last=False)
+            return result
+
+        wrapper.cache_clear = cache.clear  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
+
+
+class SemanticCache:
+    """LRU cache that matches queries by embedding similarity.
+
+    A lookup hits when the cosine similarity between the query vector and a
+    cached vector is at least ``threshold``, so near-duplicate queries reuse
+    an earlier result. Entries expire ``ttl`` seconds after insertion.
+    """
+
+    def __init__(
+        self, threshold: float = 0.95, maxsize: int = 256, ttl: float = 3600.0
+    ) -> None:
+        """Create an empty cache."""
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, Tuple[np.ndarray, Any, float]] = OrderedDict()
+        # Cached vectors stacked into one matrix, rebuilt only when entries are
+        # added or removed so a lookup is a single matrix-vector product.
+        self._keys: list[str] = []
+        self._matrix: Optional[np.ndarray] = None
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def get(self, vector: Sequence[float]) -> Optional[Any]:
+        """Return the value cached for the most similar query, if close enough."""
+        now = time.monotonic()
+        expired = [k for k, (_, _, expires) in self._entries.items() if expires <= now]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrix = None
+        if not self._entries:
+            return None
+
+        if self._matrix is None:
+            self._keys = list(self._entries)
+            self._matrix = np.stack([self._entries[k][0] for k in self._keys])
+        scores = self._matrix @ self._normalize(vector)
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        key = self._keys[best]
+        self._entries.move_to_end(key)
+        return self._entries[key][1]
 
-# Save updated cache
-def save_cache(data):
-    with open(CACHE_FILE, 'w') as file:
-        json.dump(data, file, indent=4)
+    def put(self, key: str, vector: Sequence[float], value: Any) -> None:
+        """Cache ``value`` under ``key``, evicting the least recently used entry."""
+        self._entries[key] = (
+            self._normalize(vector),
+            value,
+            time.monotonic() + self.ttl,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        self._matrix = None
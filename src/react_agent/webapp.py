@@ -0,0 +1,23 @@
+"""Custom HTTP app for the LangGraph server, used for its lifespan hooks.
+
+It is registered under ``http.app`` in langgraph.json. The server merges it
+with its own routes and runs its lifespan on the event loop that serves the
+graphs, so the tools' resources can be released there on shutdown.
+"""
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from starlette.applications import Starlette
+
+from react_agent import tools
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette) -> AsyncIterator[None]:
+    """Flush pending cache writes and close the shared HTTP client on shutdown."""
+    yield
+    await tools.aclose()
+
+
+app = Starlette(lifespan=lifespan)
@@ -0,0 +1,206 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from typing import AsyncIterator
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from react_agent import retriever
+from react_agent.retriever import VectorStoreManager
+
+
+class _UnitFakeEmbedding(DeterministicFakeEmbedding):
+    """Deterministic embeddings normalized like the real model's."""
+
+    def _get_embedding(self, seed: int) -> list[float]:
+        vector = np.asarray(super()._get_embedding(seed))
+        return list(vector / np.linalg.norm(vector))
+
+
+def _empty_manager(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> VectorStoreManager:
+    monkeypatch.setattr(retriever, "PERSIST_DIRECTORY", str(tmp_path / "index"))
+    manager = object.__new__(VectorStoreManager)
+    manager.embedding = _UnitFakeEmbedding(size=64)
+    manager.vectorstore = None
+    return manager
+
+
+def _stored_texts(manager: VectorStoreManager) -> list[str]:
+    assert manager.vectorstore is not None
+    assert manager.vectorstore.index.ntotal == len(manager.vectorstore.docstore._dict)
+    return sorted(
+        doc.page_content for doc in manager.vectorstore.docstore._dict.values()
+    )
+
+
+def test_add_missing_documents_drops_stale_chunks(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    manager = _empty_manager(tmp_path, monkeypatch)
+    manager._add_missing_documents(
+        [Document(page_content="rainfall 12mm"), Document(page_content="station list")]
+    )
+
+    manager._add_missing_documents(
+        [Document(page_content="rainfall 3mm"), Document(page_content="station list")]
+    )
+
+    assert _stored_texts(manager) == ["rainfall 3mm", "station list"]
+    manager.vectorstore = manager._load_vectorstore()
+    assert _stored_texts(manager) == ["rainfall 3mm", "station list"]
+
+
+def test_add_missing_documents_keeps_index_when_nothing_loads(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    manager = _empty_manager(tmp_path, monkeypatch)
+    manager._add_missing_documents([Document(page_content="rainfall 12mm")])
+
+    manager._add_missing_documents([])
+
+    assert _stored_texts(manager) == ["rainfall 12mm"]
+    assert "keeping the persisted index" in caplog.text
+
+
+def test_quantizer_is_not_fit_to_the_first_batch(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    manager = _empty_manager(tmp_path, monkeypatch)
+    texts = [f"station {i} reading" for i in range(500)]
+    manager._add_missing_documents([Document(page_content=texts[0])])
+    manager._add_missing_documents([Document(page_content=t) for t in texts])
+
+    assert manager.vectorstore is not None
+    hits = sum(
+        manager.vectorstore.similarity_search(text, k=1)[0].page_content == text
+        for text in texts[:100]
+    )
+    assert hits == 100
+
+
+@pytest.mark.parametrize("threshold, pooled", [(10**9, False), (0, True)])
+def test_clean_and_split_documents_sequential_and_pooled(
+    monkeypatch: pytest.MonkeyPatch, threshold: int, pooled: bool
+) -> None:
+    pools: list[int] = []
+
+    class RecordingPool(ThreadPoolExecutor):
+        def __init__(self, max_workers: int) -> None:
+            pools.append(max_workers)
+            super().__init__(max_workers=max_workers)
+
+    monkeypatch.setattr(retriever, "PARALLEL_SPLIT_MIN_CHARS", threshold)
+    monkeypatch.setattr(retriever, "ThreadPoolExecutor", RecordingPool)
+    documents = [
+        Document(page_content="<p>Rain</p><p>12mm</p>", metadata={"page": 0}),
+        Document(page_content="a" * 30, metadata={"page": 1}),
+    ]
+
+    chunks = object.__new__(VectorStoreManager)._clean_and_split_documents(
+        documents, chunk_size=20
+    )
+
+    assert [(c.page_content, c.metadata["page"]) for c in chunks] == [
+        ("Rain 12mm", 0),
+        ("a" * 20, 1),
+        ("a" * 10, 1),
+    ]
+    assert bool(pools) is pooled
+
+
+def _pdf(pages: list[str]) -> bytes:
+    """Build a minimal PDF with one line of Helvetica text per page."""
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>"
+        % (b" ".join(b"%d 0 R" % i for i in page_ids), len(pages)),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for page_id, text in zip(page_ids, pages):
+        stream = b"BT /F1 12 Tf 72 720 Td (%s) Tj ET" % text.encode()
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792]"
+            b" /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % (page_id + 1)
+        )
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+
+    body = b"%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = len(body)
+    body += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    body += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    body += b"trailer\n<< /Size %d /Root 1 0 R >>\n" % (len(objects) + 1)
+    return body + b"startxref\n%d\n%%%%EOF\n" % xref
+
+
+class _FakeSession:
+    def __init__(self, status_code: int, content: bytes) -> None:
+        self.response = SimpleNamespace(status_code=status_code, content=content)
+
+    def get(self, url: str) -> SimpleNamespace:
+        return self.response
+
+
+def test_load_pdf_returns_one_document_per_page(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        retriever, "_HTTP", _FakeSession(200, _pdf(["Cyclone alert", "Rain 12mm"]))
+    )
+
+    pages = object.__new__(VectorStoreManager)._load_pdf("https://imd.gov.in/a.pdf")
+
+    assert [(p.page_content.strip(), p.metadata) for p in pages] == [
+        ("Cyclone alert", {"source": "https://imd.gov.in/a.pdf", "page": 0}),
+        ("Rain 12mm", {"source": "https://imd.gov.in/a.pdf", "page": 1}),
+    ]
+
+
+def test_load_pdf_skips_error_responses(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    monkeypatch.setattr(
+        retriever, "_HTTP", _FakeSession(404, b"<html>Not Found</html>")
+    )
+
+    pages = object.__new__(VectorStoreManager)._load_pdf("https://imd.gov.in/a.pdf")
+
+    assert pages == []
+    assert "HTTP 404" in caplog.text
+
+
+def test_load_web_pages_collects_the_lazy_loader(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    class FakeLoader:
+        def __init__(self, urls: list[str], requests_per_second: int) -> None:
+            self.urls = urls
+
+        async def alazy_load(self) -> AsyncIterator[Document]:
+            for url in self.urls:
+                yield Document(page_content=f"page {url}", metadata={"source": url})
+
+    monkeypatch.setattr(retriever, "WebBaseLoader", FakeLoader)
+
+    docs = object.__new__(VectorStoreManager)._load_web_pages(["a", "b"])
+
+    assert [doc.page_content for doc in docs] == ["page a", "page b"]
+
+
+def test_clean_document_content_strips_markup_only_from_html() -> None:
+    html = "<table><tr><td>Station</td><td>12.5</td></tr></table>\r\n"
+
+    assert retriever._clean_document_content(html) == "Station 12.5"
+    assert retriever._clean_document_content("1 < 2\nrain") == "1 < 2 rain"
@@ -0,0 +1,190 @@
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import httpx
+import msgspec
+import pytest
+from langchain_core.documents import Document
+
+from react_agent import tools, utils
+from react_agent.tools import (
+    _format_tweet,
+    _reciprocal_rank_fusion,
+    format_response,
+    structured_prompt,
+)
+from react_agent.utils import Geo, Place, Tweet, TweetResponse, User
+
+
+def test_reciprocal_rank_fusion_merges_rankings() -> None:
+    web = [
+        {"source": "https://mausam.imd.gov.in", "content": "cyclone alert"},
+        {"source": "https://incois.gov.in", "content": "high waves"},
+    ]
+    internal = [
+        {"source": "aws_data.aspx", "content": "high waves"},
+        {"source": "aws_data.aspx", "content": "rainfall 12mm"},
+    ]
+
+    fused = _reciprocal_rank_fusion([web, internal], k=60)
+
+    assert [item["content"] for item in fused] == [
+        "high waves",
+        "cyclone alert",
+        "rainfall 12mm",
+    ]
+    assert fused[0]["score"] == 1 / 62 + 1 / 61
+
+
+def test_format_response_matches_prompt_template() -> None:
+    expected = structured_prompt.format()
+
+    assert format_response({}) == expected
+    assert format_response("Chennai forecast") == expected
+
+
+def test_format_tweet_prefers_geo_and_tolerates_missing_places() -> None:
+    tweet = Tweet(
+        id="1",
+        author_id="42",
+        text="Heavy rain in Chennai",
+        created_at="2025-02-02T10:00:00.000Z",
+        geo=Geo(place_id="p1"),
+    )
+    places = {"p1": Place(id="p1", full_name="Chennai, Tamil Nadu", country="India")}
+    users = {"42": User(id="42", location="Madurai")}
+
+    assert "Location: Chennai, Tamil Nadu, India" in _format_tweet(tweet, places, users)
+    assert "User's Location: Madurai" in _format_tweet(tweet, {}, users)
+    assert "Location: Unknown" in _format_tweet(tweet, {}, {})
+
+
+def test_tweet_response_decodes_search_payload() -> None:
+    body = b"""{
+        "data": [{"id": "1", "author_id": "42", "text": "Rain",
+                  "created_at": "2025-02-02T10:00:00.000Z",
+                  "edit_history_tweet_ids": ["1"]}],
+        "meta": {"result_count": 1}
+    }"""
+
+    payload = msgspec.json.decode(body, type=TweetResponse)
+
+    assert payload.data[0].text == "Rain"
+    assert payload.data[0].geo is None
+    assert payload.includes.places == []
+    assert msgspec.json.decode(b"{}", type=TweetResponse).data == []
+
+
+def test_twitter_search_tool_returns_only_this_querys_tweets(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    old = Tweet(id="0", author_id="7", text="Cyclone last week", created_at="")
+    new = Tweet(id="1", author_id="42", text="Heavy rain now", created_at="")
+    cache = {"twitter": {"0": old}, "summarization": {}}
+    written: list[dict[str, Any]] = []
+
+    async def fake_search(query: str) -> TweetResponse:
+        return TweetResponse(data=[new])
+
+    monkeypatch.setattr(tools, "TWITTER_BEARER_TOKEN", "token")
+    monkeypatch.setattr(tools, "_search_recent_tweets", fake_search)
+    monkeypatch.setattr(tools, "load_cache", lambda: cache)
+    monkeypatch.setattr(tools, "write_cache", written.append)
+
+    async def run() -> str:
+        result = await tools.twitter_search_tool("chennai rain")
+        await tools.aclose()
+        return result
+
+    result = asyncio.run(run())
+
+    assert "Heavy rain now" in result
+    assert "Cyclone last week" not in result
+    assert list(cache["twitter"]) == ["0", "1"]
+    # The writer thread gets a snapshot, never the dict later calls mutate.
+    [snapshot] = written
+    assert snapshot == cache
+    assert snapshot["twitter"] is not cache["twitter"]
+
+
+def test_twitter_search_tool_reports_malformed_responses(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def respond(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=b'{"data": [{"id": 1}]}')
+
+    async def run() -> str:
+        monkeypatch.setattr(
+            tools,
+            "_httpx_client",
+            httpx.AsyncClient(transport=httpx.MockTransport(respond)),
+        )
+        return await tools.twitter_search_tool("chennai rain")
+
+    monkeypatch.setattr(tools, "TWITTER_BEARER_TOKEN", "token")
+    tools._search_recent_tweets.cache_clear()  # type: ignore[attr-defined]
+
+    result = asyncio.run(run())
+
+    assert result.startswith("Error: Could not parse the Twitter API response")
+
+
+@pytest.mark.parametrize(
+    "contents",
+    [b'{"twitter": {"1": {"id": "1"', b'{"twitter": {"1": {"id": 1}}}'],
+)
+def test_twitter_search_tool_reports_unreadable_caches(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, contents: bytes
+) -> None:
+    cache_file = tmp_path / "search_cache.json"
+    cache_file.write_bytes(contents)
+    tweet = Tweet(id="1", author_id="42", text="Heavy rain now", created_at="")
+
+    async def fake_search(query: str) -> TweetResponse:
+        return TweetResponse(data=[tweet])
+
+    monkeypatch.setattr(utils, "CACHE_FILE", str(cache_file))
+    monkeypatch.setattr(utils, "_cache_mem", None)
+    monkeypatch.setattr(tools, "TWITTER_BEARER_TOKEN", "token")
+    monkeypatch.setattr(tools, "_search_recent_tweets", fake_search)
+
+    result = asyncio.run(tools.twitter_search_tool("chennai rain"))
+
+    assert result.startswith("Error: Could not read the tweet cache")
+
+
+def test_hybrid_retrieve_falls_back_to_the_source_that_succeeds(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def failing_search(query: str) -> list[dict[str, Any]]:
+        raise httpx.ConnectError("Tavily is down")
+
+    async def fake_retrieve(query: str) -> list[Document]:
+        return [
+            Document(page_content="cyclone alert", metadata={"source": "a.pdf"}),
+            Document(page_content="rainfall 12mm"),
+        ]
+
+    monkeypatch.setattr(tools, "_search", failing_search)
+    monkeypatch.setattr(tools, "_retrieve_documents", fake_retrieve)
+
+    fused = asyncio.run(tools.hybrid_retrieve("chennai rain", config={}))
+
+    assert fused == [
+        {"source": "a.pdf", "content": "cyclone alert", "score": 1 / 61},
+        {"source": "Internal Source", "content": "rainfall 12mm", "score": 1 / 62},
+    ]
+
+
+def test_hybrid_retrieve_raises_when_both_sources_fail(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def failing(query: str) -> list[Any]:
+        raise httpx.ConnectError("offline")
+
+    monkeypatch.setattr(tools, "_search", failing)
+    monkeypatch.setattr(tools, "_retrieve_documents", failing)
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(tools.hybrid_retrieve("chennai rain", config={}))
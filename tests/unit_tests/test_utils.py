@@ -0,0 +1,119 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from react_agent import utils
+from react_agent.utils import (
+    SemanticCache,
+    Tweet,
+    async_ttl_cache,
+    get_message_text,
+)
+
+
+def test_get_message_text_joins_content_blocks() -> None:
+    msg = AIMessage(
+        content=["Rain ", {"type": "text", "text": "expected"}, {"type": "image"}]
+    )
+
+    assert get_message_text(msg) == "Rain expected"
+    assert get_message_text(AIMessage(content="Sunny")) == "Sunny"
+
+
+def test_semantic_cache_matches_similar_vectors() -> None:
+    cache = SemanticCache(threshold=0.95)
+    cache.put("chennai weather", [1.0, 0.0, 0.0], "sunny")
+
+    assert cache.get([0.99, 0.05, 0.0]) == "sunny"
+    assert cache.get([0.0, 1.0, 0.0]) is None
+
+
+def test_semantic_cache_evicts_least_recently_used() -> None:
+    cache = SemanticCache(maxsize=2)
+    cache.put("a", [1.0, 0.0, 0.0], "a")
+    cache.put("b", [0.0, 1.0, 0.0], "b")
+    assert cache.get([1.0, 0.0, 0.0]) == "a"
+    cache.put("c", [0.0, 0.0, 1.0], "c")
+
+    assert cache.get([0.0, 1.0, 0.0]) is None
+    assert cache.get([1.0, 0.0, 0.0]) == "a"
+
+
+def test_semantic_cache_expires_entries() -> None:
+    cache = SemanticCache(ttl=0.0)
+    cache.put("a", [1.0, 0.0], "a")
+
+    assert cache.get([1.0, 0.0]) is None
+
+
+def test_async_ttl_cache_reuses_results() -> None:
+    calls = []
+
+    @async_ttl_cache(ttl=60)
+    async def lookup(query: str) -> str:
+        calls.append(query)
+        return query.upper()
+
+    async def run() -> None:
+        assert await lookup("rain") == "RAIN"
+        assert await lookup("rain") == "RAIN"
+        assert await lookup("wind") == "WIND"
+
+    asyncio.run(run())
+    assert calls == ["rain", "wind"]
+
+
+def test_async_ttl_cache_expires_results() -> None:
+    calls = []
+
+    @async_ttl_cache(ttl=0)
+    async def lookup(query: str) -> str:
+        calls.append(query)
+        return query
+
+    async def run() -> None:
+        await lookup("rain")
+        await lookup("rain")
+
+    asyncio.run(run())
+    assert calls == ["rain", "rain"]
+
+
+def test_save_cache_round_trips_through_disk(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache_file = tmp_path / "search_cache.json"
+    monkeypatch.setattr(utils, "CACHE_FILE", str(cache_file))
+    monkeypatch.setattr(utils, "_cache_mem", None)
+
+    cache = utils.load_cache()
+    assert cache == {"twitter": {}, "summarization": {}}
+    cache["twitter"]["1"] = Tweet(
+        id="1", author_id="42", text="Heavy rain", created_at="2025-02-02"
+    )
+    utils.save_cache(cache)
+
+    monkeypatch.setattr(utils, "_cache_mem", None)
+    assert utils.load_cache() == cache
+    assert list(tmp_path.iterdir()) == [cache_file]
+
+
+def test_load_cache_converts_cached_tweets_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache_file = tmp_path / "search_cache.json"
+    cache_file.write_bytes(
+        b'{"twitter": {"1": {"id": "1", "author_id": "42", "text": "Heavy rain",'
+        b' "created_at": "2025-02-02"}}, "summarization": {}}'
+    )
+    monkeypatch.setattr(utils, "CACHE_FILE", str(cache_file))
+    monkeypatch.setattr(utils, "_cache_mem", None)
+
+    cache = utils.load_cache()
+
+    assert cache["twitter"]["1"] == Tweet(
+        id="1", author_id="42", text="Heavy rain", created_at="2025-02-02"
+    )
+    assert utils.load_cache() is cache
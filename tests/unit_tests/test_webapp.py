@@ -0,0 +1,19 @@
+import asyncio
+
+from react_agent import tools
+from react_agent.webapp import app, lifespan
+
+
+def test_lifespan_flushes_writes_and_closes_client() -> None:
+    async def run() -> None:
+        async with lifespan(app):
+            client = tools._get_httpx_client()
+            write = asyncio.create_task(asyncio.sleep(0.01))
+            tools._pending_writes.add(write)
+            write.add_done_callback(tools._pending_writes.discard)
+
+        assert write.done()
+        assert client.is_closed
+        assert tools._httpx_client is None
+
+    asyncio.run(run())